@@ -5,21 +5,257 @@ Kubernetes Monitoring Dashboard
 """
 
 import os
-import yaml
-import json
-import requests
+import sys
+import stat
+import hashlib
+import urllib3
 import subprocess
+import time
+import orjson
+from collections import deque
+from datetime import datetime
+from functools import wraps
+
+try:
+    import readline
+except ImportError:
+    # readline недоступен на Windows
+    readline = None
+
+
+# Содержимое генерируемых файлов проекта
+DEPLOYMENT_YAML = """apiVersion: apps/v1
+kind: Deployment
+metadata:
+  name: my-docker-app
+spec:
+  replicas: 1
+  selector:
+    matchLabels:
+      app: my-docker-app
+  template:
+    metadata:
+      labels:
+        app: my-docker-app
+    spec:
+      containers:
+      - name: my-docker-app
+        image: my-docker-app:latest
+        imagePullPolicy: Never
+        ports:
+        - containerPort: 5000
+        resources:
+          requests:
+            memory: "128Mi"
+            cpu: "100m"
+          limits:
+            memory: "256Mi"
+            cpu: "200m"""
+
+JENKINS_SCRIPT = """#!/bin/bash
+# Улучшенный скрипт Jenkins сборки
+
+echo "=== Шаг 1: Сборка Docker-образа ==="
+docker build -t my-docker-app:latest .
+
+echo "=== Шаг 2: Загрузка в Minikube ==="
+minikube image load my-docker-app:latest
+
+echo "=== Шаг 3: Проверка образа ==="
+docker images | grep my-docker-app
+
+echo "=== Шаг 4: Развертывание в Kubernetes ==="
+kubectl apply -f deployment.yaml
+kubectl apply -f service.yaml
+
+echo "=== Шаг 5: Проверка статуса ==="
+kubectl get deployment my-docker-app
+kubectl get svc my-docker-service
+
+echo "✅ Сборка и развертывание завершены!"
+"""
+
+APP_PY = """from flask import Flask, jsonify
 import psutil
+import socket
 from datetime import datetime
-from kubernetes import client, config
-from prometheus_api_client import PrometheusConnect
+
+app = Flask(__name__)
+
+@app.route('/')
+def home():
+    return '''
+    <h1>Kubernetes Monitoring App</h1>
+    <p>Доступные endpoints:</p>
+    <ul>
+        <li><a href="/health">/health</a> - Статус приложения</li>
+        <li><a href="/metrics">/metrics</a> - Системные метрики</li>
+        <li><a href="/info">/info</a> - Информация о системе</li>
+    </ul>
+    '''
+
+@app.route('/health')
+def health():
+    return jsonify({
+        'status': 'healthy',
+        'timestamp': datetime.now().isoformat(),
+        'hostname': socket.gethostname()
+    })
+
+@app.route('/metrics')
+def metrics():
+    cpu = psutil.cpu_percent(interval=1)
+    memory = psutil.virtual_memory()
+    disk = psutil.disk_usage('/')
+
+    return jsonify({
+        'cpu_percent': cpu,
+        'memory_percent': memory.percent,
+        'memory_available_gb': round(memory.available / (1024**3), 2),
+        'disk_percent': disk.percent,
+        'disk_free_gb': round(disk.free / (1024**3), 2)
+    })
+
+@app.route('/info')
+def info():
+    return jsonify({
+        'system': socket.gethostname(),
+        'platform': psutil.os.name,
+        'python_version': psutil.__version__,
+        'cores': psutil.cpu_count(),
+        'total_memory_gb': round(psutil.virtual_memory().total / (1024**3), 2)
+    })
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=5000, debug=False)
+"""
+
+REQUIREMENTS_TXT = """Flask==2.3.3
+psutil==5.9.5
+kubernetes==26.1.0
+pyyaml==6.0
+requests==2.31.0
+urllib3==2.0.7
+orjson==3.9.10"""
+
+
+# PromQL запросы метрик (как в проекте)
+CPU_QUERY = '100 - (avg by (instance) (rate(node_cpu_seconds_total{mode="idle"}[5m])) * 100)'
+MEMORY_QUERY = '100 * (1 - (node_memory_MemAvailable_bytes / node_memory_MemTotal_bytes))'
+DISK_QUERY = '100 - ((node_filesystem_avail_bytes{mountpoint="/"} * 100) / node_filesystem_size_bytes{mountpoint="/"})'
+PODS_QUERY = 'kube_pod_status_phase{namespace="monitoring"}'
+
+METRIC_QUERIES = {
+    'cpu': CPU_QUERY,
+    'memory': MEMORY_QUERY,
+    'disk': DISK_QUERY,
+    'pods': PODS_QUERY,
+}
+
+# Служебная метка для разбора результатов объединенного запроса к Prometheus
+METRIC_LABEL = "dashboard_metric"
+
+# Все метрики одним запросом: каждой серии добавляется метка
+# с именем метрики, по которой результаты разбираются обратно
+COMBINED_METRICS_QUERY = ' or '.join(
+    f'label_replace(({query}), "{METRIC_LABEL}", "{key}", "", "")'
+    for key, query in METRIC_QUERIES.items()
+)
+
+# Время жизни кэша метрик, соответствует интервалу опроса Prometheus
+METRICS_CACHE_TTL = 15
+
+# Адреса по умолчанию, если их не удалось определить
+DEFAULT_PROMETHEUS_URL = "http://localhost:9090"
+DEFAULT_MINIKUBE_IP = "192.168.49.2"
+
+# Признак того, что kubeconfig уже загружен в этом процессе
+_KUBE_LOADED = False
+
+# Кэш результатов медленных вызовов: ключ -> (значение, время истечения)
+_ttl_cache_store = {}
+
+
+def ttl_cache(seconds, uncached=()):
+    """Кэширование результата функции на заданное число секунд
+
+    Значения из uncached (запасные и ошибочные) не кэшируются.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args):
+            key = (func.__name__, args)
+            cached = _ttl_cache_store.get(key)
+            if cached and cached[1] > time.monotonic():
+                return cached[0]
+            value = func(*args)
+            if value not in uncached:
+                _ttl_cache_store[key] = (value, time.monotonic() + seconds)
+            return value
+        return wrapper
+    return decorator
+
+
+def ensure_kube(reload=False):
+    """Загрузка kubeconfig только при первом обращении (или по запросу)"""
+    global _KUBE_LOADED
+    if _KUBE_LOADED and not reload:
+        return False
+    from kubernetes import config
+    config.load_kube_config()
+    _KUBE_LOADED = True
+    return True
+
+
+def content_digest(data):
+    """Короткий BLAKE2b хэш содержимого файла"""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+# Генерируемые файлы: путь -> (содержимое в байтах, хэш), вычисляется при импорте
+GENERATED_FILES = {
+    path: (content.encode(), content_digest(content.encode()))
+    for path, content in (
+        ('deployment.yaml', DEPLOYMENT_YAML),
+        ('jenkins-build.sh', JENKINS_SCRIPT),
+        ('app.py', APP_PY),
+        ('requirements.txt', REQUIREMENTS_TXT),
+    )
+}
+
+
+def write_if_changed(path):
+    """Запись генерируемого файла только если его содержимое отличается"""
+    data, new_hash = GENERATED_FILES[path]
+    try:
+        with open(path, 'rb') as f:
+            if content_digest(f.read()) == new_hash:
+                return False
+    except FileNotFoundError:
+        pass
+
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
 
 
 class KubernetesMonitor:
     def __init__(self, namespace="monitoring"):
         self.namespace = namespace
         self.k8s_config = None
-        self.prometheus = None
+        self.prometheus_url = None
+        # Последние метрики: (время получения, значения)
+        self.metrics_cache = (0.0, {})
+        self.apps_v1 = None
+        self.core_v1 = None
+        # Namespace приложения: берется из текущего контекста kubeconfig
+        self.app_namespace = "default"
+        # Общий пул соединений с keep-alive для запросов к Prometheus
+        self.http = urllib3.PoolManager(
+            num_pools=1, maxsize=4,
+            # Зависший Prometheus не должен блокировать панель
+            timeout=urllib3.Timeout(connect=5.0, read=30.0)
+        )
 
         # Пути к файлам проекта
         self.project_files = {
@@ -36,15 +272,25 @@ class KubernetesMonitor:
             result = subprocess.run(['minikube', 'status'],
                                     capture_output=True, text=True)
 
+            minikube_started = False
             if 'Running' not in result.stdout:
                 print("Запуск Minikube...")
-                subprocess.run(['minikube', 'start', '--memory=4096', '--cpus=2'],
-                               capture_output=True)
-
-            # Загружаем конфигурацию Kubernetes
-            config.load_kube_config()
+                if not self.run_checked(['minikube', 'start', '--memory=4096', '--cpus=2']):
+                    return False
+                minikube_started = True
+
+            # Загружаем конфигурацию Kubernetes (повторно только после запуска Minikube)
+            if ensure_kube(reload=minikube_started):
+                self.apps_v1 = None
+                self.core_v1 = None
+            self.init_kubernetes_clients()
+            from kubernetes import client
             self.k8s_config = client.Configuration()
 
+            # После запуска Minikube IP и порты сервисов могли измениться
+            if minikube_started:
+                _ttl_cache_store.clear()
+
             # Подключаемся к Prometheus
             self.connect_prometheus()
 
@@ -57,23 +303,34 @@ class KubernetesMonitor:
 
     def connect_prometheus(self):
         """Подключение к Prometheus"""
+        self.prometheus_url = None
         try:
             # Получаем URL Prometheus
             prometheus_url = self.get_prometheus_url()
-            self.prometheus = PrometheusConnect(url=prometheus_url, disable_ssl=True)
+
+            # Проверяем доступность через тот же пул соединений
+            response = self.http.request('GET', f"{prometheus_url}/-/ready",
+                                         timeout=5.0, retries=False)
+            if response.status != 200:
+                raise RuntimeError(f"Prometheus вернул HTTP {response.status}")
+
+            self.prometheus_url = prometheus_url
+            self.metrics_cache = (0.0, {})
             print(f"✅ Подключено к Prometheus: {prometheus_url}")
             return True
         except Exception as e:
+            # Найденный URL недоступен - при следующей попытке ищем заново
+            _ttl_cache_store.pop(('get_prometheus_url', (self,)), None)
             print(f"❌ Ошибка подключения к Prometheus: {e}")
             return False
 
+    @ttl_cache(300, uncached=(DEFAULT_PROMETHEUS_URL,))
     def get_prometheus_url(self):
         """Получение URL Prometheus из сервисов"""
         try:
-            config.load_kube_config()
-            v1 = client.CoreV1Api()
+            self.init_kubernetes_clients()
 
-            services = v1.list_namespaced_service(
+            services = self.core_v1.list_namespaced_service(
                 namespace=self.namespace,
                 label_selector="app=prometheus"
             )
@@ -83,13 +340,16 @@ class KubernetesMonitor:
                     port = svc.spec.ports[0].node_port
                     if port:
                         node_ip = self.get_minikube_ip()
+                        if not node_ip:
+                            return DEFAULT_PROMETHEUS_URL
                         return f"http://{node_ip}:{port}"
 
-            return "http://localhost:9090"
+            return DEFAULT_PROMETHEUS_URL
 
         except Exception:
-            return "http://localhost:9090"
+            return DEFAULT_PROMETHEUS_URL
 
+    @ttl_cache(300, uncached=("", DEFAULT_MINIKUBE_IP))
     def get_minikube_ip(self):
         """Получение IP адреса Minikube"""
         try:
@@ -97,7 +357,45 @@ class KubernetesMonitor:
                                     capture_output=True, text=True)
             return result.stdout.strip()
         except Exception:
-            return "192.168.49.2"
+            return DEFAULT_MINIKUBE_IP
+
+    def init_kubernetes_clients(self):
+        """Ленивое создание клиентов Kubernetes API"""
+        if self.apps_v1 is None or self.core_v1 is None:
+            ensure_kube()
+            from kubernetes import client, config
+            self.apps_v1 = client.AppsV1Api()
+            self.core_v1 = client.CoreV1Api()
+
+            # kubectl без -n использует namespace текущего контекста
+            _, active_context = config.list_kube_config_contexts()
+            self.app_namespace = active_context['context'].get('namespace', 'default')
+
+    def run_streaming(self, args, on_line=None):
+        """Запуск команды с построчным чтением вывода вместо буферизации"""
+        process = subprocess.Popen(args, stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT,
+                                   bufsize=1, text=True, errors='replace')
+        try:
+            for line in process.stdout:
+                if on_line:
+                    on_line(line)
+        except BaseException:
+            # Не оставляем дочерний процесс без присмотра
+            process.kill()
+            raise
+        finally:
+            process.stdout.close()
+        return process.wait()
+
+    def run_checked(self, args, tail_lines=20):
+        """Запуск команды; при ошибке печатает последние строки вывода"""
+        tail = deque(maxlen=tail_lines)
+        returncode = self.run_streaming(args, on_line=tail.append)
+        if returncode != 0:
+            print(f"❌ Команда '{' '.join(args)}' завершилась с кодом {returncode}:")
+            print(''.join(tail), end='')
+        return returncode == 0
 
     def deploy_application(self):
         """Развертывание приложения из файлов проекта"""
@@ -109,22 +407,28 @@ class KubernetesMonitor:
 
             # 2. Собираем Docker образ
             print("🔨 Сборка Docker образа...")
-            subprocess.run(['docker', 'build', '-t', 'my-docker-app:latest', '.'],
-                           capture_output=True)
+            # CLI, а не Docker SDK: SDK использует устаревший классический
+            # сборщик без BuildKit и без общего кэша со сборкой в jenkins-build.sh
+            if not self.run_checked(['docker', 'build', '-t', 'my-docker-app:latest', '.']):
+                return False
 
             # 3. Загружаем образ в Minikube
             print("📦 Загрузка образа в Minikube...")
-            subprocess.run(['minikube', 'image', 'load', 'my-docker-app:latest'],
-                           capture_output=True)
+            if not self.run_checked(['minikube', 'image', 'load', 'my-docker-app:latest']):
+                return False
 
             # 4. Применяем конфигурации
             print("⚙️ Применение Kubernetes манифестов...")
-            subprocess.run(['kubectl', 'apply', '-f', 'deployment.yaml'],
-                           capture_output=True)
-            subprocess.run(['kubectl', 'apply', '-f', 'service.yaml'],
-                           capture_output=True)
-
-            # 5. Проверяем статус
+            self.init_kubernetes_clients()
+            # Один вызов kubectl: kubeconfig читается один раз, одно соединение с API
+            if not self.run_checked(['kubectl', 'apply', '-n', self.app_namespace,
+                                     '-f', self.project_files['deployment'],
+                                     '-f', self.project_files['service']]):
+                return False
+
+            # 5. Ждем готовности и проверяем статус
+            if not self.wait_for_ready():
+                return False
             self.check_deployment_status()
 
             print("✅ Приложение успешно развернуто!")
@@ -136,110 +440,105 @@ class KubernetesMonitor:
 
     def fix_deployment_file(self):
         """Исправление deployment.yaml файла"""
-        deployment_content = """apiVersion: apps/v1
-kind: Deployment
-metadata:
-  name: my-docker-app
-spec:
-  replicas: 1
-  selector:
-    matchLabels:
-      app: my-docker-app
-  template:
-    metadata:
-      labels:
-        app: my-docker-app
-    spec:
-      containers:
-      - name: my-docker-app
-        image: my-docker-app:latest
-        imagePullPolicy: Never
-        ports:
-        - containerPort: 5000
-        resources:
-          requests:
-            memory: "128Mi"
-            cpu: "100m"
-          limits:
-            memory: "256Mi"
-            cpu: "200m"""
-
-        with open('deployment.yaml', 'w') as f:
-            f.write(deployment_content)
+        write_if_changed('deployment.yaml')
 
         print("✅ Файл deployment.yaml исправлен")
 
+    def wait_for_ready(self, timeout=120):
+        """Ожидание готовности деплоймента через watch вместо опроса"""
+        print("⏳ Ожидание готовности деплоймента...")
+
+        try:
+            self.init_kubernetes_clients()
+            from kubernetes import watch
+
+            w = watch.Watch()
+            for event in w.stream(self.apps_v1.list_namespaced_deployment,
+                                  namespace=self.app_namespace,
+                                  field_selector='metadata.name=my-docker-app',
+                                  timeout_seconds=timeout):
+                deployment = event['object']
+                status = deployment.status
+                replicas = deployment.spec.replicas
+
+                # Условие как в `kubectl rollout status`: контроллер увидел новую
+                # ревизию, все реплики обновлены, старых подов не осталось
+                # и все новые поды доступны
+                updated = status.updated_replicas or 0
+                if ((status.observed_generation or 0) >= deployment.metadata.generation
+                        and updated == replicas
+                        and (status.replicas or 0) == updated
+                        and (status.available_replicas or 0) >= updated):
+                    w.stop()
+                    return True
+
+            print("⚠️ Деплоймент не стал готов за отведенное время")
+            return False
+
+        except Exception as e:
+            print(f"Ошибка ожидания деплоймента: {e}")
+            return False
+
     def check_deployment_status(self):
         """Проверка статуса деплоймента"""
         try:
-            result = subprocess.run(
-                ['kubectl', 'get', 'deployment', 'my-docker-app', '-o', 'json'],
-                capture_output=True, text=True
-            )
+            self.init_kubernetes_clients()
+            from kubernetes.client.rest import ApiException
 
-            if result.returncode == 0:
-                data = json.loads(result.stdout)
-                ready = data['status'].get('readyReplicas', 0)
-                total = data['spec']['replicas']
+            try:
+                deployment = self.apps_v1.read_namespaced_deployment(
+                    'my-docker-app', self.app_namespace
+                )
+            except ApiException:
+                return False
 
-                print(f"📊 Статус деплоймента: {ready}/{total} готово")
+            ready = deployment.status.ready_replicas or 0
+            total = deployment.spec.replicas
 
-                if ready == total:
-                    print("🎉 Деплоймент готов!")
+            print(f"📊 Статус деплоймента: {ready}/{total} готово")
 
-                    # Получаем URL сервиса
-                    service_result = subprocess.run(
-                        ['kubectl', 'get', 'svc', 'my-docker-service', '-o', 'json'],
-                        capture_output=True, text=True
-                    )
+            if ready == total:
+                print("🎉 Деплоймент готов!")
 
-                    if service_result.returncode == 0:
-                        svc_data = json.loads(service_result.stdout)
-                        node_port = svc_data['spec']['ports'][0]['nodePort']
-                        ip = self.get_minikube_ip()
-                        print(f"🌐 Доступно по адресу: http://{ip}:{node_port}")
+                # Получаем URL сервиса
+                try:
+                    service = self.core_v1.read_namespaced_service(
+                        'my-docker-service', self.app_namespace
+                    )
+                    node_port = service.spec.ports[0].node_port
+                    ip = self.get_minikube_ip()
+                    print(f"🌐 Доступно по адресу: http://{ip}:{node_port}")
+                except ApiException:
+                    pass
 
-                return ready == total
-            return False
+            return ready == total
 
         except Exception as e:
             print(f"Ошибка проверки статуса: {e}")
             return False
 
-    def get_prometheus_metrics(self):
-        """Получение метрик из Prometheus"""
-        if not self.prometheus:
+    def get_prometheus_metrics(self, force=False):
+        """Получение метрик из Prometheus (force=True - без кэша)"""
+        if not self.prometheus_url:
             print("⚠️ Prometheus не подключен")
             return {}
 
         try:
-            metrics = {}
-
-            # 1. CPU Usage (как в проекте)
-            cpu_query = '100 - (avg by (instance) (rate(node_cpu_seconds_total{mode="idle"}[5m])) * 100)'
-            cpu_result = self.prometheus.custom_query(cpu_query)
-            metrics['cpu'] = cpu_result[0]['value'][1] if cpu_result else "N/A"
-
-            # 2. Memory Usage
-            memory_query = '100 * (1 - (node_memory_MemAvailable_bytes / node_memory_MemTotal_bytes))'
-            memory_result = self.prometheus.custom_query(memory_query)
-            metrics['memory'] = memory_result[0]['value'][1] if memory_result else "N/A"
-
-            # 3. Disk Usage
-            disk_query = '100 - ((node_filesystem_avail_bytes{mountpoint="/"} * 100) / node_filesystem_size_bytes{mountpoint="/"})'
-            disk_result = self.prometheus.custom_query(disk_query)
-            metrics['disk'] = disk_result[0]['value'][1] if disk_result else "N/A"
-
-            # 4. Pod статусы
-            pods_query = 'kube_pod_status_phase{namespace="monitoring"}'
-            pods_result = self.prometheus.custom_query(pods_query)
-            metrics['pods'] = len(pods_result) if pods_result else 0
-
-            print(f"📊 Метрики Prometheus:")
-            print(f"  CPU: {metrics.get('cpu', 'N/A')}%")
-            print(f"  Память: {metrics.get('memory', 'N/A')}%")
-            print(f"  Диск: {metrics.get('disk', 'N/A')}%")
-            print(f"  Pods в monitoring: {metrics.get('pods', 0)}")
+            # Метрики в пределах интервала опроса Prometheus берутся из кэша
+            now = time.monotonic()
+            cached_at, metrics = self.metrics_cache
+            if force or not metrics or now - cached_at >= METRICS_CACHE_TTL:
+                metrics = self.fetch_prometheus_metrics()
+                self.metrics_cache = (now, metrics)
+
+            # Весь блок выводится одной записью
+            sys.stdout.write(
+                f"📊 Метрики Prometheus:\n"
+                f"  CPU: {metrics.get('cpu', 'N/A')}%\n"
+                f"  Память: {metrics.get('memory', 'N/A')}%\n"
+                f"  Диск: {metrics.get('disk', 'N/A')}%\n"
+                f"  Pods в monitoring: {metrics.get('pods', 0)}\n"
+            )
 
             return metrics
 
@@ -247,6 +546,27 @@ spec:
             print(f"❌ Ошибка получения метрик: {e}")
             return {}
 
+    def fetch_prometheus_metrics(self):
+        """Запрос текущих значений метрик у Prometheus"""
+        metrics = {}
+
+        results = {key: [] for key in METRIC_QUERIES}
+        for series in self.query_prometheus(COMBINED_METRICS_QUERY):
+            results[series['metric'][METRIC_LABEL]].append(series)
+
+        for key in ('cpu', 'memory', 'disk'):
+            metrics[key] = results[key][0]['value'][1] if results[key] else "N/A"
+        metrics['pods'] = len(results['pods'])
+        return metrics
+
+    def query_prometheus(self, query):
+        """Выполнение одного PromQL запроса через /api/v1/query"""
+        response = self.http.request('GET', f"{self.prometheus_url}/api/v1/query",
+                                     fields={'query': query})
+        if response.status != 200:
+            raise RuntimeError(f"Prometheus вернул HTTP {response.status}")
+        return orjson.loads(response.data)['data']['result']
+
     def run_jenkins_build(self):
         """Запуск Jenkins сборки"""
         print("🛠 Запуск Jenkins сборки...")
@@ -257,22 +577,20 @@ spec:
                 print("⚠️ Файл jenkins-build.sh не найден, создаю...")
                 self.create_jenkins_script()
 
-            # Делаем файл исполняемым
-            os.chmod('jenkins-build.sh', 0o755)
+            # Делаем файл исполняемым, если он еще не такой
+            mode = os.stat('jenkins-build.sh').st_mode
+            if not mode & 0o111:
+                os.chmod('jenkins-build.sh', stat.S_IMODE(mode) | 0o755)
 
             # Запускаем сборку
-            result = subprocess.run(
+            # Вывод скрипта печатается по мере выполнения
+            returncode = self.run_streaming(
                 ['bash', 'jenkins-build.sh'],
-                capture_output=True,
-                text=True
+                on_line=lambda line: print(line, end='')
             )
 
-            print(result.stdout)
-            if result.stderr:
-                print(f"⚠️ Предупреждения: {result.stderr}")
-
             print("✅ Jenkins сборка завершена")
-            return result.returncode == 0
+            return returncode == 0
 
         except Exception as e:
             print(f"❌ Ошибка Jenkins сборки: {e}")
@@ -280,160 +598,86 @@ spec:
 
     def create_jenkins_script(self):
         """Создание Jenkins скрипта"""
-        script_content = """#!/bin/bash
-# Улучшенный скрипт Jenkins сборки
-
-echo "=== Шаг 1: Сборка Docker-образа ==="
-docker build -t my-docker-app:latest .
-
-echo "=== Шаг 2: Загрузка в Minikube ==="
-minikube image load my-docker-app:latest
-
-echo "=== Шаг 3: Проверка образа ==="
-docker images | grep my-docker-app
-
-echo "=== Шаг 4: Развертывание в Kubernetes ==="
-kubectl apply -f deployment.yaml
-kubectl apply -f service.yaml
-
-echo "=== Шаг 5: Проверка статуса ==="
-kubectl get deployment my-docker-app
-kubectl get svc my-docker-service
-
-echo "✅ Сборка и развертывание завершены!"
-"""
-
-        with open('jenkins-build.sh', 'w') as f:
-            f.write(script_content)
+        write_if_changed('jenkins-build.sh')
 
     def create_app_py(self):
         """Создание основного приложения"""
-        app_content = """from flask import Flask, jsonify
-import psutil
-import socket
-from datetime import datetime
+        write_if_changed('app.py')
 
-app = Flask(__name__)
-
-@app.route('/')
-def home():
-    return '''
-    <h1>Kubernetes Monitoring App</h1>
-    <p>Доступные endpoints:</p>
-    <ul>
-        <li><a href="/health">/health</a> - Статус приложения</li>
-        <li><a href="/metrics">/metrics</a> - Системные метрики</li>
-        <li><a href="/info">/info</a> - Информация о системе</li>
-    </ul>
-    '''
-
-@app.route('/health')
-def health():
-    return jsonify({
-        'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
-        'hostname': socket.gethostname()
-    })
-
-@app.route('/metrics')
-def metrics():
-    cpu = psutil.cpu_percent(interval=1)
-    memory = psutil.virtual_memory()
-    disk = psutil.disk_usage('/')
+        print("✅ Файл app.py создан")
 
-    return jsonify({
-        'cpu_percent': cpu,
-        'memory_percent': memory.percent,
-        'memory_available_gb': round(memory.available / (1024**3), 2),
-        'disk_percent': disk.percent,
-        'disk_free_gb': round(disk.free / (1024**3), 2)
-    })
+    def create_requirements(self):
+        """Создание requirements.txt"""
+        write_if_changed('requirements.txt')
 
-@app.route('/info')
-def info():
-    return jsonify({
-        'system': socket.gethostname(),
-        'platform': psutil.os.name,
-        'python_version': psutil.__version__,
-        'cores': psutil.cpu_count(),
-        'total_memory_gb': round(psutil.virtual_memory().total / (1024**3), 2)
-    })
+        print("✅ Файл requirements.txt создан")
 
-if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=False)
-"""
+    def show_metrics(self, force=False):
+        """Вывод текущих метрик Prometheus"""
+        metrics = self.get_prometheus_metrics(force=force)
+        if metrics:
+            lines = [f"  {key}: {value}" for key, value in metrics.items()]
+            sys.stdout.write("\n📈 ТЕКУЩИЕ МЕТРИКИ:\n" + "\n".join(lines) + "\n")
 
-        with open('app.py', 'w') as f:
-            f.write(app_content)
+    def create_missing_files(self):
+        """Создание недостающих файлов проекта"""
+        self.create_app_py()
+        self.create_requirements()
+        self.create_jenkins_script()
 
-        print("✅ Файл app.py создан")
+    def setup_menu_completion(self):
+        """Автодополнение и история ввода для меню через readline"""
+        if readline is None:
+            return
 
-    def create_requirements(self):
-        """Создание requirements.txt"""
-        requirements = """Flask==2.3.3
-psutil==5.9.5
-prometheus-api-client==0.5.1
-kubernetes==26.1.0
-pyyaml==6.0
-requests==2.31.0"""
+        options = [str(i) for i in range(1, 9)] + ['3r']
 
-        with open('requirements.txt', 'w') as f:
-            f.write(requirements)
+        def completer(text, state):
+            matches = [option for option in options if option.startswith(text)]
+            return matches[state] if state < len(matches) else None
 
-        print("✅ Файл requirements.txt создан")
+        readline.set_completer(completer)
+        readline.parse_and_bind('tab: complete')
 
     def dashboard(self):
         """Запуск интерактивной панели управления"""
-        import time
+        self.setup_menu_completion()
 
         print("\n" + "=" * 50)
         print("KUBERNETES MONITORING DASHBOARD".center(50))
         print("=" * 50)
 
+        actions = {
+            '1': self.setup_environment,
+            '2': self.deploy_application,
+            '3': self.show_metrics,
+            '3r': lambda: self.show_metrics(force=True),
+            '4': self.run_jenkins_build,
+            '5': self.check_deployment_status,
+            '6': self.create_missing_files,
+            '7': self.open_grafana,
+        }
+
         while True:
             print("\n📊 МЕНЮ:")
             print("1. Проверить окружение")
             print("2. Развернуть приложение")
-            print("3. Получить метрики Prometheus")
+            print("3. Получить метрики Prometheus (3r - обновить без кэша)")
             print("4. Запустить Jenkins сборку")
             print("5. Проверить статус приложения")
             print("6. Создать недостающие файлы")
             print("7. Открыть Grafana")
             print("8. Выход")
 
-            choice = input("\nВыберите действие (1-8): ").strip()
-
-            if choice == '1':
-                self.setup_environment()
-
-            elif choice == '2':
-                self.deploy_application()
-
-            elif choice == '3':
-                metrics = self.get_prometheus_metrics()
-                if metrics:
-                    print("\n📈 ТЕКУЩИЕ МЕТРИКИ:")
-                    for key, value in metrics.items():
-                        print(f"  {key}: {value}")
-
-            elif choice == '4':
-                self.run_jenkins_build()
-
-            elif choice == '5':
-                self.check_deployment_status()
-
-            elif choice == '6':
-                self.create_app_py()
-                self.create_requirements()
-                self.create_jenkins_script()
-
-            elif choice == '7':
-                self.open_grafana()
+            choice = input("\nВыберите действие (1-8, 3r): ").strip()
 
-            elif choice == '8':
+            if choice == '8':
                 print("👋 Выход из программы")
                 break
 
+            action = actions.get(choice)
+            if action:
+                action()
             else:
                 print("⚠️ Неверный выбор")
 